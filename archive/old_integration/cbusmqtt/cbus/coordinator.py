@@ -4,10 +4,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Callable, Coroutine, Dict, Mapping, Optional
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from ..const import (
@@ -21,49 +24,75 @@ from ..const import (
     CONF_PORT,
     CONF_SERIAL_PORT,
     CONF_TIMEOUT,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_TIMEOUT,
+    DISCOVERY_BATCH_DELAY,
     DOMAIN,
-    EVENT_CBUS_DEVICE_DISCOVERED,
+    EVENT_CBUS_DEVICES_DISCOVERED,
     EVENT_CBUS_STATE_CHANGED,
     INTERFACE_PCI,
     INTERFACE_SERIAL,
     INTERFACE_TCP,
-    UPDATE_INTERVAL,
+    WATCHDOG_INTERVAL,
 )
-from .interface import CBusInterface
+from .interface import CBusError, CBusInterface
 
 _LOGGER = logging.getLogger(__name__)
 
+# Connection settings passed to the interface for each interface type
+_CONNECTION_KEYS = {
+    INTERFACE_TCP: ("host", "port"),
+    INTERFACE_SERIAL: ("serial_port",),
+    INTERFACE_PCI: ("serial_port",),
+}
+
 
 class CBusCoordinator(DataUpdateCoordinator):
     """Coordinator for C-Bus communication."""
 
     def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-        """Initialize the coordinator."""
+        """Initialize the coordinator.
+
+        No update interval is set: state is pushed from the C-Bus monitoring
+        stream, and a long-interval watchdog covers idle periods.
+        """
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=UPDATE_INTERVAL,
         )
         self.config_entry = config_entry
         self.interface: CBusInterface | None = None
         self.connected = False
         self.device_states: Dict[int, Dict[str, Any]] = {}
         self.discovered_devices: Dict[int, Dict[str, Any]] = {}
+        self._loop = hass.loop
+        self._snapshot: Dict[str, Any] | None = None
+        self._last_activity = 0.0
+        self._pending_discoveries: list[Dict[str, Any]] = []
+        self._discovery_flush_handle: asyncio.TimerHandle | None = None
+        self._unsub_watchdog: Callable[[], None] | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._dispatch: Dict[
+            str, Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]
+        ] = {
+            "group_state": self._on_group_state,
+        }
 
         # Configuration
-        self.interface_type = config_entry.data[CONF_INTERFACE_TYPE]
-        self.host = config_entry.data.get(CONF_HOST)
-        self.port = config_entry.data.get(CONF_PORT)
-        self.serial_port = config_entry.data.get(CONF_SERIAL_PORT)
-        self.network = config_entry.data[CONF_NETWORK]
-        self.application = config_entry.data[CONF_APPLICATION]
-        self.monitoring_enabled = config_entry.options.get(
-            CONF_MONITORING_ENABLED, True
-        )
-        self.poll_interval = config_entry.options.get(CONF_POLL_INTERVAL, 30)
-        self.timeout = config_entry.options.get(CONF_TIMEOUT, 5)
-        self.max_retries = config_entry.options.get(CONF_MAX_RETRIES, 3)
+        data = config_entry.data
+        options = config_entry.options
+        self.interface_type = data[CONF_INTERFACE_TYPE]
+        self.host = data.get(CONF_HOST)
+        self.port = data.get(CONF_PORT)
+        self.serial_port = data.get(CONF_SERIAL_PORT)
+        self.network = data[CONF_NETWORK]
+        self.application = data[CONF_APPLICATION]
+        self.monitoring_enabled = options.get(CONF_MONITORING_ENABLED, True)
+        self.poll_interval = options.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)
+        self.timeout = options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+        self.max_retries = options.get(CONF_MAX_RETRIES, DEFAULT_MAX_RETRIES)
 
     async def async_setup(self) -> None:
         """Set up the coordinator."""
@@ -80,22 +109,12 @@ class CBusCoordinator(DataUpdateCoordinator):
                 "timeout": self.timeout,
                 "max_retries": self.max_retries,
             },
+            **{
+                key: getattr(self, key)
+                for key in _CONNECTION_KEYS.get(self.interface_type, ())
+            },
         }
 
-        if self.interface_type == INTERFACE_TCP:
-            interface_config.update(
-                {
-                    "host": self.host,
-                    "port": self.port,
-                }
-            )
-        elif self.interface_type in [INTERFACE_SERIAL, INTERFACE_PCI]:
-            interface_config.update(
-                {
-                    "serial_port": self.serial_port,
-                }
-            )
-
         # Create and initialize interface
         self.interface = CBusInterface(interface_config)
         await self.interface.initialize()
@@ -106,6 +125,13 @@ class CBusCoordinator(DataUpdateCoordinator):
         # Start interface
         await self.interface.start()
         self.connected = True
+        self._snapshot = None
+        self._last_activity = self._loop.time()
+
+        # Only ping when the bus has been quiet for a whole watchdog period
+        self._unsub_watchdog = async_track_time_interval(
+            self.hass, self._async_watchdog, timedelta(seconds=WATCHDOG_INTERVAL)
+        )
 
         _LOGGER.info("C-Bus coordinator setup complete")
 
@@ -113,64 +139,137 @@ class CBusCoordinator(DataUpdateCoordinator):
         """Shut down the coordinator."""
         _LOGGER.info("Shutting down C-Bus coordinator")
 
+        if self._unsub_watchdog:
+            self._unsub_watchdog()
+            self._unsub_watchdog = None
+
+        if self._discovery_flush_handle:
+            self._discovery_flush_handle.cancel()
+            self._discovery_flush_handle = None
+
+        # Cancel in-flight discovery and refresh work before stopping
+        if self._tasks:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
         if self.interface:
             await self.interface.stop()
             self.interface = None
 
         self.connected = False
+        self._snapshot = None
 
     async def _async_update_data(self) -> Dict[str, Any]:
-        """Update data from C-Bus."""
+        """Fetch the initial data snapshot from C-Bus.
+
+        Subsequent updates are pushed by ``_handle_cbus_event``.
+        """
         if not self.connected or not self.interface:
             raise UpdateFailed("C-Bus interface not connected")
 
         try:
-            # Test connection
-            if not await self.interface.ping():
-                raise UpdateFailed("C-Bus ping failed")
+            # Test connection, unless the bus was active within poll_interval
+            if self._loop.time() - self._last_activity >= self.poll_interval:
+                if not await self.interface.ping():
+                    raise UpdateFailed("C-Bus ping failed")
+                self._last_activity = self._loop.time()
 
             # Return current device states
-            return {
-                "devices": self.device_states,
-                "discovered": self.discovered_devices,
-                "connected": self.connected,
-            }
+            return self._get_snapshot()
 
-        except Exception as ex:
+        except (CBusError, OSError) as ex:
             _LOGGER.error("Error updating C-Bus data: %s", ex)
             raise UpdateFailed(f"Error updating C-Bus data: {ex}") from ex
 
     async def _handle_cbus_event(self, event: Dict[str, Any]) -> None:
         """Handle C-Bus events."""
-        if event["type"] == "group_state":
-            group = event["group"]
-            level = event["level"]
-            state = event["state"]
-
-            # Update device state
+        handler = self._dispatch.get(event["type"])
+        if handler:
+            await handler(event)
+
+    async def _on_group_state(self, event: Dict[str, Any]) -> None:
+        """Handle a group state event."""
+        group = event["group"]
+        level = event["level"]
+        state = event["state"]
+
+        # Update device state in place; only new groups get a record
+        now = self._loop.time()
+        device_state = self.device_states.get(group)
+        if device_state is None:
             self.device_states[group] = {
                 "level": level,
                 "state": state,
                 "group": group,
-                "last_updated": asyncio.get_event_loop().time(),
+                "last_updated": now,
             }
+        else:
+            device_state["level"] = level
+            device_state["state"] = state
+            device_state["last_updated"] = now
+
+        # Discover device if not known; run eagerly so discovery doesn't
+        # delay the state update below
+        if group not in self.discovered_devices:
+            self._async_create_task(
+                self._discover_device(group), f"{DOMAIN} discover group {group}"
+            )
 
-            # Discover device if not known
-            if group not in self.discovered_devices:
-                await self._discover_device(group)
+        self._last_activity = now
 
-            # Fire Home Assistant event
-            self.hass.bus.async_fire(
-                EVENT_CBUS_STATE_CHANGED,
-                {
-                    "group": group,
-                    "level": level,
-                    "state": state,
-                },
-            )
+        # Fire Home Assistant event with the documented payload; the
+        # interface's dict carries extra keys and is shared with its other
+        # callbacks
+        self.hass.bus.async_fire(
+            EVENT_CBUS_STATE_CHANGED, {"group": group, "level": level, "state": state}
+        )
+
+        # Store the snapshot and notify listeners
+        self.async_set_updated_data(self._get_snapshot())
+
+    def _async_create_task(
+        self, coro: Coroutine[Any, Any, None], name: str
+    ) -> asyncio.Task:
+        """Create an eager task that is cancelled on shutdown."""
+        task = self.hass.async_create_task(coro, name, eager_start=True)
+        if not task.done():
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _get_snapshot(self) -> Dict[str, Any]:
+        """Return the data snapshot, building it if needed.
+
+        The snapshot references the live state maps, so it only has to be
+        rebuilt when the connection state changes.
+        """
+        if self._snapshot is None:
+            self._snapshot = {
+                "devices": self.device_states,
+                "discovered": self.discovered_devices,
+                "connected": self.connected,
+            }
+        return self._snapshot
+
+    async def _async_watchdog(self, now: datetime) -> None:
+        """Ping C-Bus if there has been no activity for a watchdog period."""
+        if not self.connected or not self.interface:
+            return
+
+        # Ticks are WATCHDOG_INTERVAL apart, so with timer jitter idle can land
+        # just under the interval on a link that has been quiet for a whole
+        # tick. Only skip the ping for activity in the last half interval.
+        idle = self._loop.time() - self._last_activity
+        if idle < WATCHDOG_INTERVAL / 2:
+            return
 
-            # Notify listeners
-            self.async_update_listeners()
+        if await self.interface.ping():
+            self._last_activity = self._loop.time()
+            return
+
+        _LOGGER.warning("C-Bus ping failed after %.0f seconds without activity", idle)
+        self.async_set_update_error(UpdateFailed("C-Bus ping failed"))
 
     async def _discover_device(self, group: int) -> None:
         """Discover a new device."""
@@ -187,8 +286,21 @@ class CBusCoordinator(DataUpdateCoordinator):
 
         self.discovered_devices[group] = device_info
 
-        # Fire discovery event
-        self.hass.bus.async_fire(EVENT_CBUS_DEVICE_DISCOVERED, device_info)
+        # Queue discovery event; bursts are coalesced into a single event
+        self._pending_discoveries.append(device_info)
+        if self._discovery_flush_handle is None:
+            self._discovery_flush_handle = self._loop.call_later(
+                DISCOVERY_BATCH_DELAY, self._flush_discoveries
+            )
+
+    def _flush_discoveries(self) -> None:
+        """Fire one event for all devices discovered since the last flush."""
+        self._discovery_flush_handle = None
+        devices, self._pending_discoveries = self._pending_discoveries, []
+        if devices:
+            self.hass.bus.async_fire(
+                EVENT_CBUS_DEVICES_DISCOVERED, {"devices": devices}
+            )
 
     async def async_set_device_level(self, group: int, level: int) -> None:
         """Set device level."""
@@ -197,8 +309,9 @@ class CBusCoordinator(DataUpdateCoordinator):
 
         try:
             await self.interface.set_group_level(group, level)
+            self._last_activity = self._loop.time()
             _LOGGER.debug("Set group %s to level %s", group, level)
-        except Exception as ex:
+        except (CBusError, OSError) as ex:
             _LOGGER.error("Error setting group %s level: %s", group, ex)
             raise
 
@@ -211,10 +324,11 @@ class CBusCoordinator(DataUpdateCoordinator):
 
         try:
             await self.interface.ramp_group(group, level, ramp_time)
+            self._last_activity = self._loop.time()
             _LOGGER.debug(
                 "Ramping group %s to level %s over %s seconds", group, level, ramp_time
             )
-        except Exception as ex:
+        except (CBusError, OSError) as ex:
             _LOGGER.error("Error ramping group %s: %s", group, ex)
             raise
 
@@ -226,7 +340,7 @@ class CBusCoordinator(DataUpdateCoordinator):
         try:
             await self.interface.get_group_level(group)
             _LOGGER.debug("Syncing group %s", group)
-        except Exception as ex:
+        except (CBusError, OSError) as ex:
             _LOGGER.error("Error syncing group %s: %s", group, ex)
             raise
 
@@ -235,28 +349,43 @@ class CBusCoordinator(DataUpdateCoordinator):
         if not self.interface:
             raise ValueError("C-Bus interface not available")
 
-        try:
-            # Poll all known devices
-            for group in list(self.device_states.keys()):
-                await self.async_sync_device(group)
-
+        interface = self.interface
+        groups = list(self.device_states)
+        # Bound in-flight requests so the PCI/serial link isn't overrun
+        semaphore = asyncio.Semaphore(self.max_retries * 4)
+
+        async def _sync(group: int) -> None:
+            async with semaphore:
+                await interface.get_group_level(group)
+
+        # Poll all known devices concurrently
+        tasks = [
+            self._async_create_task(_sync(group), f"{DOMAIN} sync group {group}")
+            for group in groups
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        failed = 0
+        for group, result in zip(groups, results):
+            if isinstance(result, Exception):
+                failed += 1
+                _LOGGER.error("Error syncing group %s: %s", group, result)
+
+        if failed:
+            _LOGGER.error(
+                "Error refreshing devices: %s of %s failed", failed, len(groups)
+            )
+        else:
             _LOGGER.debug("Refreshed all devices")
-        except Exception as ex:
-            _LOGGER.error("Error refreshing devices: %s", ex)
-            raise
 
     def get_device_state(self, group: int) -> Dict[str, Any] | None:
         """Get device state."""
         return self.device_states.get(group)
 
-    def get_discovered_devices(self) -> Dict[int, Dict[str, Any]]:
-        """Get discovered devices."""
-        return self.discovered_devices.copy()
+    def get_discovered_devices(self) -> Mapping[int, Dict[str, Any]]:
+        """Get a read-only view of discovered devices."""
+        return MappingProxyType(self.discovered_devices)
 
     def is_device_discovered(self, group: int) -> bool:
         """Check if device is discovered."""
         return group in self.discovered_devices
-
-    async def async_add_listener(self, update_callback) -> None:
-        """Add update listener."""
-        return self.async_add_listener(update_callback)
@@ -11,6 +11,14 @@ import serial.aio
 _LOGGER = logging.getLogger(__name__)
 
 
+class CBusError(Exception):
+    """Base class for C-Bus interface errors."""
+
+
+class CBusConnectionError(CBusError, ConnectionError):
+    """Error connecting to or communicating with C-Bus."""
+
+
 class CBusInterface:
     """Interface for C-Bus communication."""
 
@@ -120,9 +128,9 @@ class CBusInterface:
             self.logger.info(f"TCP connection established to {self.host}:{self.port}")
 
         except asyncio.TimeoutError:
-            raise ConnectionError(f"Connection timeout to {self.host}:{self.port}")
+            raise CBusConnectionError(f"Connection timeout to {self.host}:{self.port}")
         except Exception as e:
-            raise ConnectionError(f"Failed to connect via TCP: {e}")
+            raise CBusConnectionError(f"Failed to connect via TCP: {e}")
 
     async def _connect_serial(self):
         """Connect via serial."""
@@ -137,7 +145,7 @@ class CBusInterface:
             self.logger.info(f"Serial connection established to {self.serial_port}")
 
         except Exception as e:
-            raise ConnectionError(f"Failed to connect via serial: {e}")
+            raise CBusConnectionError(f"Failed to connect via serial: {e}")
 
     async def _connect_pci(self):
         """Connect via PCI."""
@@ -151,7 +159,7 @@ class CBusInterface:
             self.logger.info("PCI connection established")
 
         except Exception as e:
-            raise ConnectionError(f"Failed to connect via PCI: {e}")
+            raise CBusConnectionError(f"Failed to connect via PCI: {e}")
 
     async def disconnect(self):
         """Disconnect from C-Bus."""
@@ -191,7 +199,7 @@ class CBusInterface:
     async def _send_command(self, command: str):
         """Send a command to C-Bus."""
         if not self.connected or not self.connection:
-            raise ConnectionError("Not connected to C-Bus")
+            raise CBusConnectionError("Not connected to C-Bus")
 
         try:
             command_bytes = (command + "\r\n").encode("ascii")
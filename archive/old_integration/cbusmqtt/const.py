@@ -62,7 +62,7 @@ ATTR_RAMP_TIME = "ramp_time"
 
 # Events
 EVENT_CBUS_STATE_CHANGED = "cbus_state_changed"
-EVENT_CBUS_DEVICE_DISCOVERED = "cbus_device_discovered"
+EVENT_CBUS_DEVICES_DISCOVERED = "cbus_devices_discovered"
 
 # Device info
 DEVICE_MANUFACTURER = "Clipsal"
@@ -71,3 +71,5 @@ DEVICE_MODEL = "C-Bus Device"
 # Update intervals
 UPDATE_INTERVAL = 10  # seconds
 FAST_UPDATE_INTERVAL = 1  # seconds for recently changed devices
+WATCHDOG_INTERVAL = 300  # seconds between C-Bus watchdog checks
+DISCOVERY_BATCH_DELAY = 0.05  # seconds to coalesce discovery events
@@ -18,7 +18,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import CBusEntity
 from .cbus.coordinator import CBusCoordinator
-from .const import DOMAIN
+from .const import DOMAIN, EVENT_CBUS_DEVICES_DISCOVERED
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,16 +42,18 @@ async def async_setup_entry(
 
     # Listen for new device discoveries
     @callback
-    def _handle_device_discovered(event):
-        """Handle new device discovery."""
-        if event.data.get("type") == "light":
-            group = event.data["group"]
-            device_info = coordinator.get_discovered_devices().get(group)
-            if device_info:
-                async_add_entities([CBusLight(coordinator, group, device_info)])
+    def _handle_devices_discovered(event):
+        """Handle a batch of new device discoveries."""
+        new_entities = [
+            CBusLight(coordinator, device_info["group"], device_info)
+            for device_info in event.data["devices"]
+            if device_info.get("type") == "light"
+        ]
+        if new_entities:
+            async_add_entities(new_entities)
 
     # Register event listener
-    hass.bus.async_listen("cbus_device_discovered", _handle_device_discovered)
+    hass.bus.async_listen(EVENT_CBUS_DEVICES_DISCOVERED, _handle_devices_discovered)
 
 
 class CBusLight(CBusEntity, LightEntity):
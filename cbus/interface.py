@@ -3,31 +3,126 @@ C-Bus Interface for communication with C-Bus PCI/CNI devices
 """
 
 import asyncio
+import itertools
 import logging
+import re
 import socket
-from typing import Optional, Dict, Any, Callable, List
+from typing import Optional, Dict, Any, Callable, List, Union
 from dataclasses import dataclass
 from enum import Enum
 
 import serial
 import serial_asyncio
 
+from cbus.rate_limiter import TokenBucket
 from config.config import Config
 
+# Maximum number of discovery probes in flight at once
+DISCOVERY_CONCURRENCY = 16
+
+# Default sustained rate (commands per second) for group level queries
+COMMAND_RATE = 20
+
+# Two-digit uppercase hex for every byte value, for building commands
+_HEX2 = tuple(b"%02X" % value for value in range(256))
+
+# Backoff bounds (seconds) after errors in the I/O loops
+ERROR_BACKOFF_MIN = 0.1
+ERROR_BACKOFF_MAX = 5.0
+
+# Patterns for structured query replies
+_LEVEL_RE = re.compile(r'level[:\s]+(\d+)', re.IGNORECASE)
+_LABEL_RE = re.compile(r'label[:\s]+(.+)', re.IGNORECASE)
+
+
+class _StreamConn:
+    """C-Bus connection over an asyncio stream pair (TCP/CNI or serial)."""
+    
+    __slots__ = ('reader', 'writer')
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        
+    async def send(self, data: bytes):
+        """Write data and wait for the transport to drain."""
+        self.writer.write(data)
+        await self.writer.drain()
+        
+    async def readline(self) -> bytes:
+        """Read one CRLF-terminated frame from the connection.
+        
+        Raises ConnectionError once the peer has closed the connection, as
+        reads at EOF return immediately and would never block again.
+        """
+        try:
+            return await self.reader.readuntil(b"\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                raise ConnectionError("Connection closed by C-Bus") from None
+            return e.partial
+        
+    async def close(self):
+        """Close the connection."""
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+@dataclass(slots=True)
+class CBusEvent:
+    """Event passed to callbacks registered with add_event_callback."""
+    type: str
+    application: int
+    group: int
+    level: int
+    state: bool
+
+
+@dataclass(slots=True)
+class CBusCompletion:
+    """Reply to a level query issued with CBusInterface.submit."""
+    req_id: int
+    group: int
+    level: int
+
 
 class CBusInterface:
     """Interface for C-Bus communication."""
     
+    # Fixed initialization commands, pre-encoded
+    _CMD_RESET = b"|||\r\n"
+    _CMD_ENABLE_MONITORING = b"g\r\n"
+    
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.connection = None
         self.connected = False
-        self.event_callbacks = []
+        self.event_callbacks = ()
+        self._callback_tasks = set()
         self.command_queue = asyncio.Queue()
-        self.response_queue = asyncio.Queue()
+        
+        # Pipelined level queries: submit() records the request against its
+        # group and the matching group reply is put on completions
+        self.completions: asyncio.Queue = asyncio.Queue()
+        self._submitted: Dict[int, int] = {}
+        self._req_ids = itertools.count(1)
+        self._dimmable_cache: Dict[int, bool] = {}
+        
+        # Query replies carry no group, so only one query is outstanding at a
+        # time and the next reply resolves _reply
+        self._query_lock = asyncio.Lock()
+        self._reply: Optional[asyncio.Future] = None
+        
+        # Response handlers keyed by the first byte of the frame
+        self._response_handlers: Dict[int, Optional[Callable]] = {
+            ord('\\'): None,  # Network response
+            ord('@'): None,  # Application response
+            ord('g'): self._process_group_response,  # Group state updates
+        }
         self.monitoring_task = None
         self.command_task = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Configuration
         self.interface_type = config.get('cbus.interface')
@@ -37,6 +132,19 @@ class CBusInterface:
         self.network = config.get('cbus.network', 254)
         self.application = config.get('cbus.application', 56)
         self.timeout = config.get('cbus.monitoring.timeout', 5)
+        self.discovery_concurrency = config.get('cbus.discovery_concurrency', DISCOVERY_CONCURRENCY)
+        self.command_rate = config.get('cbus.command_rate', COMMAND_RATE)
+        
+        # Shared pacing for level queries and polls, so concurrent probes
+        # can't flood the interface
+        self.rate_limiter = TokenBucket(self.command_rate, self.discovery_concurrency)
+        
+        # Pre-encoded command prefixes for this network/application
+        self._network_cmd = b"\\%02X\r\n" % self.network
+        self._application_cmd = b"@%02X\r\n" % self.application
+        self._init_cmd = self._network_cmd + self._application_cmd + self._CMD_ENABLE_MONITORING
+        self._app_prefix = b"@" + _HEX2[self.application]
+        self._status_prefix = b"g" + _HEX2[self.application]
         
     async def initialize(self):
         """Initialize the C-Bus interface."""
@@ -93,6 +201,9 @@ class CBusInterface:
         if self.connected:
             return
             
+        # Cache the loop for hot paths; connect() runs before any I/O
+        self._loop = asyncio.get_running_loop()
+            
         try:
             if self.interface_type == 'tcp':
                 await self._connect_tcp()
@@ -120,11 +231,7 @@ class CBusInterface:
                 timeout=self.timeout
             )
             
-            self.connection = {
-                'reader': reader,
-                'writer': writer,
-                'type': 'tcp'
-            }
+            self.connection = _StreamConn(reader, writer)
             
             self.logger.info(f"TCP connection established to {self.host}:{self.port}")
             
@@ -137,16 +244,12 @@ class CBusInterface:
         """Connect via serial."""
         try:
             # Create serial connection
-            serial_conn = serial_asyncio.Serial(
-                port=self.serial_port,
-                baudrate=9600,
-                timeout=self.timeout
+            reader, writer = await serial_asyncio.open_serial_connection(
+                url=self.serial_port,
+                baudrate=9600
             )
             
-            self.connection = {
-                'serial': serial_conn,
-                'type': 'serial'
-            }
+            self.connection = _StreamConn(reader, writer)
             
             self.logger.info(f"Serial connection established to {self.serial_port}")
             
@@ -157,16 +260,12 @@ class CBusInterface:
         """Connect via PCI."""
         # For PCI, we use the same serial connection but with different parameters
         try:
-            serial_conn = serial_asyncio.Serial(
-                port=self.config.get('cbus.pci_device', '/dev/ttyUSB0'),
-                baudrate=9600,
-                timeout=self.timeout
+            reader, writer = await serial_asyncio.open_serial_connection(
+                url=self.config.get('cbus.pci_device', '/dev/ttyUSB0'),
+                baudrate=9600
             )
             
-            self.connection = {
-                'serial': serial_conn,
-                'type': 'pci'
-            }
+            self.connection = _StreamConn(reader, writer)
             
             self.logger.info("PCI connection established")
             
@@ -178,96 +277,103 @@ class CBusInterface:
         if not self.connected:
             return
             
+        # Stop the I/O loops before closing the connection under them
+        current_task = asyncio.current_task()
+        for task in (self.monitoring_task, self.command_task):
+            if task and task is not current_task:
+                task.cancel()
+            
         try:
             if self.connection:
-                if self.connection['type'] == 'tcp':
-                    self.connection['writer'].close()
-                    await self.connection['writer'].wait_closed()
-                elif self.connection['type'] in ['serial', 'pci']:
-                    self.connection['serial'].close()
-                    
-            self.connection = None
-            self.connected = False
+                await self.connection.close()
             self.logger.info("Disconnected from C-Bus")
             
         except Exception as e:
             self.logger.error(f"Error disconnecting: {e}")
             
+        finally:
+            # A connection that failed to close cleanly is still gone
+            self.connection = None
+            self.connected = False
+            
     async def _send_init_commands(self):
         """Send initialization commands to C-Bus."""
-        # Enable monitoring
-        await self._send_command("|||")  # Reset
+        # Reset the interface and give it time to settle
+        await self.connection.send(self._CMD_RESET)
         await asyncio.sleep(0.1)
         
-        # Set network and application
-        await self._send_command(f"\\{self.network:02X}")
-        await self._send_command(f"@{self.application:02X}")
-        
-        # Enable monitoring
-        await self._send_command("g")  # Enable monitoring
+        # Set network and application and enable monitoring in one write
+        await self.connection.send(self._init_cmd)
         
         self.logger.info("Initialization commands sent")
         
-    async def _send_command(self, command: str):
+    @staticmethod
+    def _encode_command(command: Union[str, bytes]) -> bytes:
+        """Encode a command for the wire.
+        
+        String commands are terminated and encoded here; bytes commands
+        must already include the trailing CRLF.
+        """
+        if isinstance(command, str):
+            return (command + "\r\n").encode('ascii')
+        return command
+        
+    async def _send_command(self, command: Union[str, bytes]):
         """Send a command to C-Bus."""
         if not self.connected or not self.connection:
             raise ConnectionError("Not connected to C-Bus")
             
         try:
-            command_bytes = (command + "\r\n").encode('ascii')
-            
-            if self.connection['type'] == 'tcp':
-                self.connection['writer'].write(command_bytes)
-                await self.connection['writer'].drain()
-            elif self.connection['type'] in ['serial', 'pci']:
-                await self.connection['serial'].write(command_bytes)
+            await self.connection.send(self._encode_command(command))
                 
-            self.logger.debug(f"Sent command: {command}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Sent command: %s", command)
             
         except Exception as e:
             self.logger.error(f"Error sending command '{command}': {e}")
             raise
             
-    async def _read_response(self) -> Optional[str]:
-        """Read response from C-Bus."""
+    async def _read_response(self) -> Optional[bytes]:
+        """Read a raw response frame from C-Bus.
+        
+        Returns None when nothing arrives within the timeout. Read errors
+        are raised, so the monitoring loop can back off or, for a lost
+        link, stop.
+        """
         if not self.connected or not self.connection:
             return None
             
         try:
-            if self.connection['type'] == 'tcp':
-                data = await asyncio.wait_for(
-                    self.connection['reader'].readline(),
-                    timeout=self.timeout
-                )
-                return data.decode('ascii').strip()
-            elif self.connection['type'] in ['serial', 'pci']:
-                data = await asyncio.wait_for(
-                    self.connection['serial'].readline(),
-                    timeout=self.timeout
-                )
-                return data.decode('ascii').strip()
+            async with asyncio.timeout(self.timeout):
+                data = await self.connection.readline()
+            return data.strip()
                 
         except asyncio.TimeoutError:
             return None
-        except Exception as e:
-            self.logger.error(f"Error reading response: {e}")
-            return None
             
     async def _monitoring_loop(self):
         """Main monitoring loop for C-Bus events."""
         self.logger.info("Starting monitoring loop")
         
+        backoff = ERROR_BACKOFF_MIN
         while self.connected:
             try:
                 response = await self._read_response()
                 if response:
                     await self._process_response(response)
+                backoff = ERROR_BACKOFF_MIN
                     
             except asyncio.CancelledError:
                 break
+            except ConnectionError as e:
+                # The link is gone; tear down so the command loop stops too
+                self.logger.error(f"C-Bus connection lost: {e}")
+                await self.disconnect()
+                break
             except Exception as e:
                 self.logger.error(f"Error in monitoring loop: {e}")
-                await asyncio.sleep(1)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, ERROR_BACKOFF_MAX)
                 
         self.logger.info("Monitoring loop stopped")
         
@@ -275,112 +381,143 @@ class CBusInterface:
         """Process command queue."""
         self.logger.info("Starting command loop")
         
+        # Block on the queue until a command arrives; disconnect() cancels
+        # the task
+        backoff = ERROR_BACKOFF_MIN
         while self.connected:
             try:
-                command = await asyncio.wait_for(
-                    self.command_queue.get(),
-                    timeout=1.0
-                )
+                commands = [await self.command_queue.get()]
                 
-                await self._send_command(command)
-                self.command_queue.task_done()
+                # Send everything already queued in one write and drain
+                while not self.command_queue.empty():
+                    commands.append(self.command_queue.get_nowait())
+                    
+                await self._send_command(
+                    b"".join(self._encode_command(command) for command in commands)
+                )
+                for _ in commands:
+                    self.command_queue.task_done()
+                backoff = ERROR_BACKOFF_MIN
                 
-            except asyncio.TimeoutError:
-                continue
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Error in command loop: {e}")
-                await asyncio.sleep(1)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, ERROR_BACKOFF_MAX)
                 
         self.logger.info("Command loop stopped")
         
-    async def _process_response(self, response: str):
+    async def _process_response(self, response: bytes):
         """Process a response from C-Bus."""
-        self.logger.debug(f"Received response: {response}")
-        
-        # Parse C-Bus response
-        if response.startswith("\\"):
-            # Network response
-            pass
-        elif response.startswith("@"):
-            # Application response
-            pass
-        elif response.startswith("g"):
-            # Group response - this is where we get state updates
-            await self._process_group_response(response)
-        else:
-            # Other response
-            pass
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Received response: %s", response.decode('ascii', 'replace'))
+        
+        # Parse C-Bus response, dispatching on the first byte
+        handler = self._response_handlers.get(response[0], self._process_query_response)
+        if handler:
+            await handler(response)
+            
+    async def _process_query_response(self, response: bytes):
+        """Process a reply to the outstanding query, if there is one."""
+        future = self._reply
+        if future is not None and not future.done():
+            future.set_result(
+                self.parse_response(response.decode('ascii', 'replace'))
+            )
             
-    async def _process_group_response(self, response: str):
+    async def _process_group_response(self, response: bytes):
         """Process a group response."""
         try:
             # Parse group response format: gAAGGLL
             # AA = Application, GG = Group, LL = Level
             if len(response) >= 7:
-                app_hex = response[1:3]
-                group_hex = response[3:5]
-                level_hex = response[5:7]
-                
-                application = int(app_hex, 16)
-                group = int(group_hex, 16)
-                level = int(level_hex, 16)
+                application, group, level = bytes.fromhex(response[1:7].decode('ascii'))
                 
                 # Only process if it's our application
                 if application == self.application:
-                    event = {
-                        'type': 'group_state',
-                        'application': application,
-                        'group': group,
-                        'level': level,
-                        'state': level > 0
-                    }
+                    req_id = self._submitted.pop(group, None)
+                    if req_id is not None:
+                        self.completions.put_nowait(CBusCompletion(req_id, group, level))
+                        
+                    event = CBusEvent('group_state', application, group, level, level > 0)
                     
-                    # Notify callbacks
+                    # Notify callbacks without blocking the monitoring loop
                     for callback in self.event_callbacks:
-                        try:
-                            await callback(event)
-                        except Exception as e:
-                            self.logger.error(f"Error in event callback: {e}")
+                        task = self._loop.create_task(callback(event))
+                        self._callback_tasks.add(task)
+                        task.add_done_callback(self._on_callback_done)
                             
         except Exception as e:
             self.logger.error(f"Error processing group response: {e}")
             
-    async def send_command(self, command: str):
+    async def send_command(self, command: Union[str, bytes]):
         """Queue a command to be sent."""
         await self.command_queue.put(command)
         
     async def set_group_level(self, group: int, level: int):
         """Set a group to a specific level."""
-        command = f"@{self.application:02X}{group:02X}{level:02X}"
+        command = self._app_prefix + _HEX2[group] + _HEX2[level] + b"\r\n"
         await self.send_command(command)
         
+    def status_command(self, group: int) -> bytes:
+        """Build the wire command requesting a group's current level."""
+        return self._status_prefix + _HEX2[group] + b"\r\n"
+        
     async def get_group_level(self, group: int) -> Optional[int]:
         """Get current level of a group."""
-        command = f"g{self.application:02X}{group:02X}"
+        command = self.status_command(group)
+        await self.rate_limiter.acquire()
         await self.send_command(command)
         
-        # Wait for response (simplified - in real implementation you'd correlate responses)
-        await asyncio.sleep(0.1)
+        # Response arrives as a group event (simplified - in real implementation you'd correlate responses)
         return None
         
+    async def submit(self, group: int) -> int:
+        """Queue a level query for a group without waiting for the reply.
+        
+        Returns a request id; the reply is put on ``completions`` as a
+        CBusCompletion carrying that id.
+        """
+        req_id = next(self._req_ids)
+        self._submitted[group] = req_id
+        await self.rate_limiter.acquire()
+        await self.send_command(self.status_command(group))
+        return req_id
+        
+    def discard_submissions(self, groups):
+        """Forget outstanding submitted queries for groups that never replied."""
+        for group in groups:
+            self._submitted.pop(group, None)
+        
     async def ramp_group(self, group: int, level: int, ramp_time: int = 0):
         """Ramp a group to a level over time."""
         if ramp_time > 0:
-            command = f"@{self.application:02X}{group:02X}{level:02X}{ramp_time:02X}"
+            command = (
+                self._app_prefix + _HEX2[group] + _HEX2[level] + b"%02X\r\n" % ramp_time
+            )
         else:
-            command = f"@{self.application:02X}{group:02X}{level:02X}"
+            command = self._app_prefix + _HEX2[group] + _HEX2[level] + b"\r\n"
         await self.send_command(command)
         
+    def _on_callback_done(self, task: asyncio.Task):
+        """Release a finished event callback task and log its failure."""
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Error in event callback: {task.exception()}")
+        
     def add_event_callback(self, callback: Callable):
         """Add an event callback."""
-        self.event_callbacks.append(callback)
+        # Callbacks are kept in a tuple that is replaced, never mutated, so
+        # the monitoring loop can iterate it while callbacks change
+        self.event_callbacks = self.event_callbacks + (callback,)
         
     def remove_event_callback(self, callback: Callable):
         """Remove an event callback."""
         if callback in self.event_callbacks:
-            self.event_callbacks.remove(callback)
+            self.event_callbacks = tuple(
+                cb for cb in self.event_callbacks if cb != callback
+            )
             
     async def ping(self) -> bool:
         """Ping C-Bus to check connection."""
@@ -388,7 +525,7 @@ class CBusInterface:
             return False
             
         try:
-            await self._send_command("z")  # Status command
+            await self.connection.send(b"z\r\n")  # Status command
             return True
         except Exception:
             return False 
@@ -399,14 +536,24 @@ class CBusInterface:
         
         self.logger.info(f"Starting device discovery scan from group {start_group} to {end_group}")
         
-        for group in range(start_group, end_group + 1):
-            device_info = await self.query_device_info(group)
+        # Probe groups concurrently, bounded so the PCI isn't overwhelmed
+        semaphore = asyncio.Semaphore(self.discovery_concurrency)
+        
+        async def probe(group: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.query_device_info(group)
+        
+        # Report devices as their probes complete rather than at the end
+        probes = [probe(group) for group in range(start_group, end_group + 1)]
+        for next_result in asyncio.as_completed(probes):
+            device_info = await next_result
             if device_info:
+                group = device_info['group']
                 discovered[group] = device_info
                 self.logger.info(f"Discovered device: {device_info['name']} (Group {group})")
         
         self.logger.info(f"Device discovery complete. Found {len(discovered)} devices.")
-        return discovered
+        return dict(sorted(discovered.items()))
     
     async def query_device_info(self, group: int) -> Optional[Dict[str, Any]]:
         """Query comprehensive device information including name/label."""
@@ -421,11 +568,11 @@ class CBusInterface:
             if not device_name:
                 device_name = f"C-Bus Device {group}"
             
-            # Get device type (basic heuristic based on response patterns)
-            device_type = await self.detect_device_type(group)
+            # Check if device is dimmable, reusing the level read above
+            is_dimmable = await self.is_device_dimmable(group, level)
             
-            # Check if device is dimmable
-            is_dimmable = await self.is_device_dimmable(group)
+            # Get device type (basic heuristic based on response patterns)
+            device_type = await self.detect_device_type(group, is_dimmable)
             
             return {
                 'group': group,
@@ -434,39 +581,42 @@ class CBusInterface:
                 'dimmable': is_dimmable,
                 'current_level': level,
                 'discovered': True,
-                'last_seen': asyncio.get_event_loop().time()
+                'last_seen': self._loop.time()
             }
             
         except Exception as e:
-            self.logger.debug(f"Error querying device info for group {group}: {e}")
+            self.logger.debug("Error querying device info for group %s: %s", group, e)
             return None
     
-    async def get_device_label(self, group: int) -> Optional[str]:
-        """Query device label/name from C-Bus system."""
+    async def get_device_label(self, group: int, timeout: float = 2.0) -> Optional[str]:
+        """Query device label/name from C-Bus system.
+        
+        ``timeout`` applies to each of the two label queries tried.
+        """
         try:
             # Try DLT (Dynamic Labelling Technology) query first
-            label = await self.query_dlt_label(group)
+            label = await self.query_dlt_label(group, timeout)
             if label:
                 return label.strip()
             
             # Try alternative label query methods
-            label = await self.query_group_label(group)
+            label = await self.query_group_label(group, timeout)
             if label:
                 return label.strip()
             
             return None
             
         except Exception as e:
-            self.logger.debug(f"Error getting device label for group {group}: {e}")
+            self.logger.debug("Error getting device label for group %s: %s", group, e)
             return None
     
-    async def query_dlt_label(self, group: int) -> Optional[str]:
+    async def query_dlt_label(self, group: int, timeout: float = 2.0) -> Optional[str]:
         """Query DLT (Dynamic Labelling Technology) label for a device."""
         try:
             # DLT label query command - varies by implementation
             # This is a common pattern for querying device labels
             command = f"get {self.application:02X} {group:02X} label"
-            response = await self.send_command_with_response(command)
+            response = await self.send_command_with_response(command, timeout)
             
             if response and 'label' in response:
                 return response['label']
@@ -474,15 +624,15 @@ class CBusInterface:
             return None
             
         except Exception as e:
-            self.logger.debug(f"DLT label query failed for group {group}: {e}")
+            self.logger.debug("DLT label query failed for group %s: %s", group, e)
             return None
     
-    async def query_group_label(self, group: int) -> Optional[str]:
+    async def query_group_label(self, group: int, timeout: float = 2.0) -> Optional[str]:
         """Query group label using alternative method."""
         try:
             # Alternative label query - some systems store labels differently
             command = f"info {self.application:02X} {group:02X}"
-            response = await self.send_command_with_response(command)
+            response = await self.send_command_with_response(command, timeout)
             
             if response and 'name' in response:
                 return response['name']
@@ -490,17 +640,25 @@ class CBusInterface:
             return None
             
         except Exception as e:
-            self.logger.debug(f"Group label query failed for group {group}: {e}")
+            self.logger.debug("Group label query failed for group %s: %s", group, e)
             return None
     
-    async def detect_device_type(self, group: int) -> str:
-        """Detect device type based on response patterns."""
+    async def detect_device_type(
+        self, group: int, dimmable: Optional[bool] = None, level: Optional[int] = None
+    ) -> str:
+        """Detect device type based on response patterns.
+        
+        Pass ``dimmable`` when it is already known to skip the dimming test,
+        or ``level`` to skip re-reading the group level before it.
+        """
         try:
             # Try to determine device type by testing different commands
             # This is heuristic-based since C-Bus doesn't always provide explicit type info
             
             # Test for dimming capability
-            if await self.is_device_dimmable(group):
+            if dimmable is None:
+                dimmable = await self.is_device_dimmable(group, level)
+            if dimmable:
                 # Could be light or fan
                 # Additional heuristics could be added here
                 return "light"
@@ -508,14 +666,22 @@ class CBusInterface:
                 return "switch"
                 
         except Exception as e:
-            self.logger.debug(f"Device type detection failed for group {group}: {e}")
+            self.logger.debug("Device type detection failed for group %s: %s", group, e)
             return "unknown"
     
-    async def is_device_dimmable(self, group: int) -> bool:
-        """Check if a device supports dimming."""
+    async def is_device_dimmable(self, group: int, original_level: Optional[int] = None) -> bool:
+        """Check if a device supports dimming.
+        
+        The result is cached per group, since the test drives the load.
+        Pass ``original_level`` when the current level is already known.
+        """
+        if group in self._dimmable_cache:
+            return self._dimmable_cache[group]
+            
         try:
             # Try to set a mid-range level and see if it responds appropriately
-            original_level = await self.get_group_level(group)
+            if original_level is None:
+                original_level = await self.get_group_level(group)
             if original_level is None:
                 return False
             
@@ -530,32 +696,38 @@ class CBusInterface:
             await self.set_group_level(group, original_level)
             
             # If level changed to something close to our test level, it's dimmable
-            return new_level is not None and abs(new_level - test_level) < 20
+            dimmable = new_level is not None and abs(new_level - test_level) < 20
+            self._dimmable_cache[group] = dimmable
+            return dimmable
             
         except Exception as e:
-            self.logger.debug(f"Dimming test failed for group {group}: {e}")
+            self.logger.debug("Dimming test failed for group %s: %s", group, e)
             return False
     
     async def send_command_with_response(self, command: str, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
-        """Send a command and wait for a structured response."""
-        try:
-            # Queue the command
-            await self.send_command(command)
-            
-            # Wait for response with timeout
-            response = await asyncio.wait_for(
-                self.response_queue.get(), 
-                timeout=timeout
-            )
-            
-            return self.parse_response(response)
-            
-        except asyncio.TimeoutError:
-            self.logger.debug(f"Command response timeout: {command}")
-            return None
-        except Exception as e:
-            self.logger.debug(f"Command response error: {e}")
-            return None
+        """Send a command and wait for a structured response.
+        
+        Queries are serialized: a reply can't be matched to its command, so
+        a second query isn't sent until the first is answered or times out.
+        """
+        async with self._query_lock:
+            self._reply = future = self._loop.create_future()
+            try:
+                # Queue the command
+                await self.send_command(command)
+                
+                # Wait for response with timeout
+                async with asyncio.timeout(timeout):
+                    return await future
+                
+            except asyncio.TimeoutError:
+                self.logger.debug("Command response timeout: %s", command)
+                return None
+            except Exception as e:
+                self.logger.debug("Command response error: %s", e)
+                return None
+            finally:
+                self._reply = None
     
     def parse_response(self, response: str) -> Dict[str, Any]:
         """Parse C-Bus response into structured data."""
@@ -565,24 +737,18 @@ class CBusInterface:
             result = {}
             
             # Example parsing for common response patterns
-            if 'level' in response.lower():
-                # Extract level information
-                import re
-                level_match = re.search(r'level[:\s]+(\d+)', response.lower())
-                if level_match:
-                    result['level'] = int(level_match.group(1))
-            
-            if 'label' in response.lower():
-                # Extract label information
-                import re
-                label_match = re.search(r'label[:\s]+(.+)', response.lower())
-                if label_match:
-                    result['label'] = label_match.group(1).strip()
+            level_match = _LEVEL_RE.search(response)
+            if level_match:
+                result['level'] = int(level_match.group(1))
+            
+            label_match = _LABEL_RE.search(response)
+            if label_match:
+                result['label'] = label_match.group(1).strip()
             
             return result
             
         except Exception as e:
-            self.logger.debug(f"Response parsing error: {e}")
+            self.logger.debug("Response parsing error: %s", e)
             return {}
     
     async def scan_active_groups(self) -> List[int]:
@@ -596,15 +762,21 @@ class CBusInterface:
             (200, 255),   # Special functions
         ]
         
+        semaphore = asyncio.Semaphore(self.discovery_concurrency)
+        
+        async def probe(group: int) -> Optional[int]:
+            # get_group_level paces itself through the rate limiter
+            async with semaphore:
+                return await self.get_group_level(group)
+        
         for start, end in test_ranges:
-            for group in range(start, end + 1):
-                try:
-                    level = await self.get_group_level(group)
-                    if level is not None:
-                        active_groups.append(group)
-                        # Small delay to avoid overwhelming the system
-                        await asyncio.sleep(0.1)
-                except Exception:
-                    continue
+            groups = range(start, end + 1)
+            levels = await asyncio.gather(
+                *(probe(group) for group in groups),
+                return_exceptions=True
+            )
+            for group, level in zip(groups, levels):
+                if level is not None and not isinstance(level, Exception):
+                    active_groups.append(group)
         
         return active_groups 
\ No newline at end of file
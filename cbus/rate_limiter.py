@@ -0,0 +1,39 @@
+"""
+Rate limiting for commands sent to C-Bus
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Token bucket limiting how fast commands are issued.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``,
+    so short bursts go out immediately while sustained traffic is held to
+    the configured rate.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -4,32 +4,33 @@ Handles device state tracking, validation, and synchronization
 """
 
 import asyncio
+import heapq
 import logging
 import time
-from typing import Dict, Any, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import IntEnum
 
 from config.config import Config
-from cbus.interface import CBusInterface
+from cbus.interface import CBusEvent, CBusInterface
 from devices.manager import DeviceManager
 
 
-class StateSource(Enum):
+class StateSource(IntEnum):
     """Source of state change."""
-    CBUS = "cbus"
-    MQTT = "mqtt"
-    POLL = "poll"
-    UNKNOWN = "unknown"
+    UNKNOWN = 0
+    CBUS = 1
+    MQTT = 2
+    POLL = 3
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceState:
     """Represents the state of a C-Bus device."""
     group: int
     level: int
     state: bool
-    last_updated: float = field(default_factory=time.time)
+    last_updated: float = field(default_factory=time.monotonic)
     last_source: StateSource = StateSource.UNKNOWN
     last_mqtt_update: float = 0
     last_cbus_update: float = 0
@@ -40,7 +41,7 @@ class DeviceState:
         """Update device state."""
         self.level = level
         self.state = level > 0
-        self.last_updated = time.time()
+        self.last_updated = time.monotonic()
         self.last_source = source
         
         if source == StateSource.CBUS:
@@ -50,18 +51,32 @@ class DeviceState:
             self.last_mqtt_update = self.last_updated
             self.pending_mqtt_update = False
     
-    def age(self) -> float:
-        """Get age of last update in seconds."""
-        return time.time() - self.last_updated
+    def age(self, now: Optional[float] = None) -> float:
+        """Get age of last update in seconds.
+        
+        Pass ``now`` (a ``time.monotonic()`` reading) when checking many
+        states in one pass.
+        """
+        if now is None:
+            now = time.monotonic()
+        return now - self.last_updated
     
-    def is_stale(self, max_age: float = 60.0) -> bool:
+    def is_stale(self, max_age: float = 60.0, now: Optional[float] = None) -> bool:
         """Check if state is stale."""
-        return self.age() > max_age
+        return self.age(now) > max_age
 
 
 class StateManager:
     """Manages device states and synchronization."""
     
+    __slots__ = (
+        'config', 'cbus_interface', 'device_manager', 'mqtt_bridge', 'logger',
+        'device_states', '_state_heap', 'publish_queue',
+        'poll_interval', 'monitoring_enabled', 'max_retries',
+        'poll_task', 'sync_task', 'cleanup_task', 'publish_task',
+        'poll_errors', 'sync_conflicts', 'last_poll_time',
+    )
+    
     def __init__(self, config: Config, cbus_interface: CBusInterface, device_manager: DeviceManager):
         self.config = config
         self.cbus_interface = cbus_interface
@@ -70,8 +85,16 @@ class StateManager:
         self.logger = logging.getLogger(__name__)
         
         # State storage
+        # Only mutated from the event loop between awaits, so no lock is needed
         self.device_states: Dict[int, DeviceState] = {}
-        self.state_lock = asyncio.Lock()
+        
+        # One (last_updated, group) entry per state, oldest first, so cleanup
+        # only looks at states that can have expired. Entries are not touched
+        # on update; cleanup re-queues any that turn out to be out of date.
+        self._state_heap: List[Tuple[float, int]] = []
+        
+        # (group, level, state) updates waiting to be published to MQTT
+        self.publish_queue: asyncio.Queue = asyncio.Queue()
         
         # Configuration
         self.poll_interval = config.get_poll_interval()
@@ -82,6 +105,7 @@ class StateManager:
         self.poll_task = None
         self.sync_task = None
         self.cleanup_task = None
+        self.publish_task = None
         
         # Tracking
         self.poll_errors = 0
@@ -104,6 +128,7 @@ class StateManager:
                     level=0,
                     state=False
                 )
+                self._track_state(self.device_states[device.group])
         
         self.logger.info(f"Initialized state tracking for {len(self.device_states)} devices")
         
@@ -111,6 +136,9 @@ class StateManager:
         """Start state manager tasks."""
         self.logger.info("Starting state manager")
         
+        # Start MQTT publishing task
+        self.publish_task = asyncio.create_task(self._publish_loop())
+        
         if self.monitoring_enabled:
             # Start polling task
             self.poll_task = asyncio.create_task(self._poll_loop())
@@ -134,6 +162,8 @@ class StateManager:
             self.sync_task.cancel()
         if self.cleanup_task:
             self.cleanup_task.cancel()
+        if self.publish_task:
+            self.publish_task.cancel()
             
         self.logger.info("State manager stopped")
         
@@ -141,45 +171,83 @@ class StateManager:
         """Set MQTT bridge reference."""
         self.mqtt_bridge = mqtt_bridge
         
-    async def _on_cbus_event(self, event: Dict[str, Any]):
+    async def _on_cbus_event(self, event: CBusEvent):
         """Handle C-Bus event."""
-        if event['type'] == 'group_state':
+        if event.type == 'group_state':
             await self._update_device_state(
-                group=event['group'],
-                level=event['level'],
+                group=event.group,
+                level=event.level,
                 source=StateSource.CBUS
             )
             
     async def _update_device_state(self, group: int, level: int, source: StateSource):
         """Update device state and notify MQTT if needed."""
-        async with self.state_lock:
-            # Get or create device state
-            if group not in self.device_states:
-                self.device_states[group] = DeviceState(
-                    group=group,
-                    level=0,
-                    state=False
-                )
-            
-            device_state = self.device_states[group]
-            old_level = device_state.level
-            old_state = device_state.state
-            
-            # Update state
+        # Fast path: most C-Bus events repeat the current level, so only the
+        # timestamps need refreshing
+        device_state = self.device_states.get(group)
+        if device_state is not None and device_state.level == level and source is StateSource.CBUS:
             device_state.update(level, source)
+            return
             
-            # Check if state actually changed
-            if old_level != level or old_state != device_state.state:
-                self.logger.debug(f"Group {group}: {old_level} -> {level} (source: {source.value})")
+        # Create device state on first sight
+        if device_state is None:
+            device_state = DeviceState(
+                group=group,
+                level=0,
+                state=False
+            )
+            self.device_states[group] = device_state
+            self._track_state(device_state)
+        
+        old_level = device_state.level
+        old_state = device_state.state
+        
+        # Update state
+        device_state.update(level, source)
+        state = device_state.state
+        
+        # Check if state actually changed
+        if old_level != level or old_state != state:
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Group %d: %d -> %d (source: %s)", group, old_level, level, source.name.lower())
+            
+            # Update statistics
+            if source == StateSource.CBUS:
+                self.cbus_interface.last_cbus_update = time.time()
+                
+            # Notify MQTT bridge if state came from C-Bus
+            if source == StateSource.CBUS and self.mqtt_bridge:
+                self.publish_queue.put_nowait((group, level, state))
+                    
+    async def _publish_loop(self):
+        """Publish queued state updates to MQTT."""
+        self.logger.info("Starting publish loop")
+        
+        while True:
+            try:
+                updates = [await self.publish_queue.get()]
                 
-                # Notify MQTT bridge if state came from C-Bus
-                if source == StateSource.CBUS and self.mqtt_bridge:
-                    await self.mqtt_bridge.publish_state_update(group, level, device_state.state)
+                # Take everything already queued; only the latest update for
+                # each group needs publishing
+                while not self.publish_queue.empty():
+                    updates.append(self.publish_queue.get_nowait())
                     
-                # Update statistics
-                if source == StateSource.CBUS:
-                    self.cbus_interface.last_cbus_update = time.time()
+                latest = {group: (level, state) for group, level, state in updates}
+                for _ in updates:
+                    self.publish_queue.task_done()
                     
+                if self.mqtt_bridge:
+                    for group, (level, state) in latest.items():
+                        await self.mqtt_bridge.publish_state_update(group, level, state)
+                        
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Error in publish loop: {e}")
+                await asyncio.sleep(1)
+                
+        self.logger.info("Publish loop stopped")
+        
     async def _poll_loop(self):
         """Polling loop to check device states."""
         self.logger.info("Starting polling loop")
@@ -206,47 +274,48 @@ class StateManager:
         if time.time() - self.last_poll_time < self.poll_interval:
             return False
             
-        # Check if we've received recent C-Bus events
-        recent_events = any(
-            state.last_cbus_update > time.time() - self.poll_interval
-            for state in self.device_states.values()
-        )
-        
-        # Poll if no recent events or if we have stale states
-        if not recent_events:
-            return True
-            
-        # Check for stale states
-        stale_states = any(
-            state.is_stale(self.poll_interval * 2)
-            for state in self.device_states.values()
-        )
-        
-        return stale_states
+        # Poll if no recent C-Bus events or if we have stale states. A state
+        # with a recent event can't be stale, so one pass answers both.
+        now = time.monotonic()
+        recent_cutoff = now - self.poll_interval
+        stale_cutoff = now - self.poll_interval * 2
+        recent_events = False
+        for state in self.device_states.values():
+            if state.last_cbus_update > recent_cutoff:
+                recent_events = True
+            elif state.last_updated < stale_cutoff:
+                return True
+                
+        return not recent_events
         
     async def _poll_devices(self):
         """Poll all devices for current state."""
         self.logger.debug("Polling devices for state")
         
         poll_start = time.time()
-        polled_count = 0
         
-        for group in self.device_states.keys():
+        # Queue the level requests; replies arrive as C-Bus events and update
+        # state through _on_cbus_event. send_command only queues, so the rate
+        # limiter is what paces them
+        send_command = self.cbus_interface.send_command
+        status_command = self.cbus_interface.status_command
+        rate_limiter = self.cbus_interface.rate_limiter
+        
+        polled_count = 0
+        for group in list(self.device_states):
             try:
-                # Request current level
-                await self.cbus_interface.send_command(f"g{self.cbus_interface.application:02X}{group:02X}")
+                # Request current level, paced with the interface's other
+                # level queries
+                await rate_limiter.acquire()
+                await send_command(status_command(group))
                 polled_count += 1
-                
-                # Small delay to avoid overwhelming the interface
-                await asyncio.sleep(0.05)
-                
             except Exception as e:
                 self.logger.error(f"Error polling group {group}: {e}")
                 
         self.last_poll_time = time.time()
         poll_duration = self.last_poll_time - poll_start
         
-        self.logger.debug(f"Polled {polled_count} devices in {poll_duration:.2f}s")
+        self.logger.debug("Polled %d devices in %.2fs", polled_count, poll_duration)
         
     async def _sync_loop(self):
         """Synchronization loop to handle conflicts."""
@@ -267,18 +336,21 @@ class StateManager:
         
     async def _check_sync_conflicts(self):
         """Check for and resolve synchronization conflicts."""
-        async with self.state_lock:
-            for group, state in self.device_states.items():
-                # Check for pending updates that might conflict
-                if state.pending_mqtt_update and state.pending_cbus_update:
-                    # Resolve conflict - C-Bus wins
-                    self.logger.warning(f"Sync conflict for group {group}, C-Bus takes precedence")
-                    state.pending_mqtt_update = False
-                    self.sync_conflicts += 1
-                    
-                    # Notify MQTT of the actual state
-                    if self.mqtt_bridge:
-                        await self.mqtt_bridge.publish_state_update(group, state.level, state.state)
+        # Collect conflicts first so publishing can't race with dict changes
+        conflicts = []
+        for group, state in self.device_states.items():
+            # Check for pending updates that might conflict
+            if state.pending_mqtt_update and state.pending_cbus_update:
+                # Resolve conflict - C-Bus wins
+                self.logger.warning(f"Sync conflict for group {group}, C-Bus takes precedence")
+                state.pending_mqtt_update = False
+                self.sync_conflicts += 1
+                conflicts.append((group, state.level, state.state))
+                
+        # Notify MQTT of the actual state
+        if self.mqtt_bridge:
+            for group, level, state in conflicts:
+                await self.mqtt_bridge.publish_state_update(group, level, state)
                         
     async def _cleanup_loop(self):
         """Cleanup loop to remove stale states."""
@@ -297,19 +369,31 @@ class StateManager:
                 
         self.logger.info("Cleanup loop stopped")
         
+    def _track_state(self, device_state: DeviceState):
+        """Start tracking a new state for stale state cleanup."""
+        heapq.heappush(self._state_heap, (device_state.last_updated, device_state.group))
+            
     async def _cleanup_stale_states(self):
         """Remove stale device states."""
-        async with self.state_lock:
-            # Find stale states
-            stale_groups = [
-                group for group, state in self.device_states.items()
-                if state.is_stale(3600)  # 1 hour
-            ]
+        cutoff = time.monotonic() - 3600  # 1 hour
+        heap = self._state_heap
+        
+        # Pop only entries old enough to have expired
+        while heap and heap[0][0] < cutoff:
+            last_updated, group = heapq.heappop(heap)
+            state = self.device_states.get(group)
             
-            # Remove stale states
-            for group in stale_groups:
-                del self.device_states[group]
-                self.logger.debug(f"Removed stale state for group {group}")
+            if state is None:
+                continue
+                
+            # Updated since the entry was queued; re-queue it if still fresh
+            if state.last_updated >= cutoff:
+                heapq.heappush(heap, (state.last_updated, group))
+                continue
+                
+            # Remove stale state
+            del self.device_states[group]
+            self.logger.debug("Removed stale state for group %s", group)
                 
     async def handle_mqtt_command(self, group: int, level: int, source: str = "mqtt"):
         """Handle MQTT command to change device state."""
@@ -318,14 +402,14 @@ class StateManager:
             await self.cbus_interface.set_group_level(group, level)
             
             # Mark as pending update
-            async with self.state_lock:
-                if group in self.device_states:
-                    self.device_states[group].pending_cbus_update = True
+            device_state = self.device_states.get(group)
+            if device_state is not None:
+                device_state.pending_cbus_update = True
                     
             # Update local state optimistically
             await self._update_device_state(group, level, StateSource.MQTT)
             
-            self.logger.debug(f"MQTT command sent: group {group} -> {level}")
+            self.logger.debug("MQTT command sent: group %s -> %s", group, level)
             
         except Exception as e:
             self.logger.error(f"Error handling MQTT command for group {group}: {e}")
@@ -336,24 +420,22 @@ class StateManager:
             await self.cbus_interface.ramp_group(group, level, ramp_time)
             
             # Mark as pending update
-            async with self.state_lock:
-                if group in self.device_states:
-                    self.device_states[group].pending_cbus_update = True
+            device_state = self.device_states.get(group)
+            if device_state is not None:
+                device_state.pending_cbus_update = True
                     
-            self.logger.debug(f"MQTT ramp command sent: group {group} -> {level} over {ramp_time}s")
+            self.logger.debug("MQTT ramp command sent: group %s -> %s over %ss", group, level, ramp_time)
             
         except Exception as e:
             self.logger.error(f"Error handling MQTT ramp for group {group}: {e}")
             
     async def get_device_state(self, group: int) -> Optional[DeviceState]:
         """Get current device state."""
-        async with self.state_lock:
-            return self.device_states.get(group)
+        return self.device_states.get(group)
             
     async def get_all_states(self) -> Dict[int, DeviceState]:
         """Get all device states."""
-        async with self.state_lock:
-            return self.device_states.copy()
+        return dict(self.device_states)
             
     async def force_refresh(self, group: int = None):
         """Force refresh of device states."""
@@ -366,6 +448,7 @@ class StateManager:
             
     def get_statistics(self) -> Dict[str, Any]:
         """Get state manager statistics."""
+        now = time.monotonic()
         return {
             'device_count': len(self.device_states),
             'poll_errors': self.poll_errors,
@@ -373,5 +456,5 @@ class StateManager:
             'last_poll_time': self.last_poll_time,
             'monitoring_enabled': self.monitoring_enabled,
             'poll_interval': self.poll_interval,
-            'stale_states': sum(1 for state in self.device_states.values() if state.is_stale())
+            'stale_states': sum(1 for state in self.device_states.values() if state.is_stale(now=now))
         } 
\ No newline at end of file
@@ -16,24 +16,42 @@ sys.path.insert(0, str(project_root))
 HOST = "192.168.0.50"
 PORT = 10001
 
-async def comprehensive_scan():
-    """Comprehensive scan of all possible C-Bus groups."""
+# How long to wait for further replies before giving up on the rest
+RESPONSE_TIMEOUT = 2.0
+
+# Label queries are sent one at a time and many PCIs don't answer them, so
+# they are off by default and use a short timeout when enabled
+QUERY_LABELS = False
+LABEL_TIMEOUT = 0.5
+
+# Group ranges to scan, as (name, first group, last group)
+SCAN_RANGES = (
+    ("Common Lights", 1, 50),
+    ("Extended", 51, 100),
+    ("Mid Range", 101, 200),
+    ("High Range", 201, 255),
+)
+
+async def comprehensive_scan(host=HOST, port=PORT, query_labels=QUERY_LABELS):
+    """Comprehensive scan of all possible C-Bus groups.
+    
+    Returns the lights found, keyed by group. Lights are named
+    "Group N" unless ``query_labels`` asks the PCI for their labels.
+    """
     try:
         from cbus.interface import CBusInterface
         from config.config import Config
-        import yaml
-        import os
         
         print(f"🚀 COMPREHENSIVE C-BUS SCAN")
-        print(f"Target: {HOST}:{PORT}")
+        print(f"Target: {host}:{port}")
         print(f"This will scan groups 1-255 to find ALL lights\n")
         
         # Create configuration
         config_data = {
             'cbus': {
                 'interface': 'tcp',
-                'host': HOST,
-                'port': PORT,
+                'host': host,
+                'port': port,
                 'network': 254,
                 'application': 56,
                 'monitoring': {
@@ -65,19 +83,15 @@ async def comprehensive_scan():
             }
         }
         
-        # Write temporary config
-        temp_config = "temp_scan_config.yaml"
-        with open(temp_config, 'w') as f:
-            yaml.dump(config_data, f)
-        
-        # Load configuration and create interface
-        config = Config(temp_config)
-        await config.load()
+        # Build configuration in memory and create interface
+        config = Config.from_dict(config_data)
         
         cbus = CBusInterface(config)
         
         print("📡 Connecting to C-Bus...")
-        await cbus.connect()
+        # start() also runs the command and monitoring loops that send the
+        # submitted queries and turn replies into completions
+        await cbus.start()
         
         if not cbus.connected:
             print("❌ Failed to connect to C-Bus")
@@ -88,68 +102,79 @@ async def comprehensive_scan():
         print("GROUP SCAN RESULTS")
         print("="*80)
         
-        # Scan ranges to try
-        scan_ranges = [
-            ("Common Lights", range(1, 51)),      # 1-50
-            ("Extended", range(51, 101)),         # 51-100
-            ("Mid Range", range(101, 201)),       # 101-200
-            ("High Range", range(201, 256)),      # 201-255
-        ]
-        
         total_found = 0
         all_lights = {}
         
-        for range_name, group_range in scan_ranges:
-            print(f"\n🔍 Scanning {range_name} (Groups {min(group_range)}-{max(group_range)})")
+        async def collect_levels(outstanding):
+            """Reap replies for submitted queries until all are in or none arrive for a while."""
+            levels = {}
+            while outstanding:
+                try:
+                    async with asyncio.timeout(RESPONSE_TIMEOUT):
+                        completion = await cbus.completions.get()
+                except TimeoutError:
+                    break
+                group = outstanding.pop(completion.req_id, None)
+                if group is not None:
+                    levels[group] = completion.level
+                    
+            # Whatever is left never answered
+            cbus.discard_submissions(outstanding.values())
+            return levels
+        
+        # Each range's output is collected here and written in one go
+        progress_buf = []
+        
+        for range_name, first_group, last_group in SCAN_RANGES:
+            print(f"\n🔍 Scanning {range_name} (Groups {first_group}-{last_group})")
+            group_range = range(first_group, last_group + 1)
             found_in_range = 0
             
+            # Submit the whole range up front (the interface paces the
+            # writes), then reap the replies as they arrive
+            outstanding = {}
             for group in group_range:
-                try:
-                    # Show progress every 10 groups
-                    if group % 10 == 0:
-                        print(f"   Checking group {group}...", end="", flush=True)
-                    
-                    # Try to get group level
-                    level = await cbus.get_group_level(group)
-                    
-                    if level is not None:
-                        found_in_range += 1
-                        total_found += 1
-                        
-                        # Try to get label/name
-                        try:
-                            label_info = await cbus.get_group_label(group)
-                            name = label_info.get('label', f"Group {group}")
-                        except:
-                            name = f"Group {group}"
-                        
-                        # Determine status
-                        if level == 0:
-                            status = "OFF"
-                            brightness = "0%"
-                        else:
-                            status = "ON"
-                            brightness = f"{int(level/255*100)}%"
-                        
-                        all_lights[group] = {
-                            'name': name,
-                            'level': level,
-                            'status': status,
-                            'brightness': brightness
-                        }
-                        
-                        print(f"\n   ✅ FOUND: Group {group:3d} | {name:<25} | {status:<3} | {brightness:>4}")
-                    
-                    # Small delay to avoid overwhelming the system
-                    await asyncio.sleep(0.1)
-                    
-                except Exception as e:
-                    # Silent continue for non-responsive groups
-                    pass
-                    
-            if group % 10 == 0:
-                print(f" ✅ Done")
+                outstanding[await cbus.submit(group)] = group
+            levels = await collect_levels(outstanding)
+            
+            # Fetch labels only for groups that answered
+            found_groups = sorted(levels)
+            label_cache = {}
+            if query_labels:
+                for group in found_groups:
+                    label_cache[group] = await cbus.get_device_label(group, LABEL_TIMEOUT)
+            
+            # The whole range has been queried by now, so report only the
+            # groups that answered
+            for group in found_groups:
+                level = levels[group]
+                found_in_range += 1
+                total_found += 1
+                
+                name = label_cache.get(group) or f"Group {group}"
+                
+                # Determine status
+                if level == 0:
+                    status = "OFF"
+                    brightness = "0%"
+                else:
+                    status = "ON"
+                    brightness = f"{int(level/255*100)}%"
                 
+                all_lights[group] = {
+                    'name': name,
+                    'level': level,
+                    'status': status,
+                    'brightness': brightness
+                }
+                
+                progress_buf.append(f"   ✅ FOUND: Group {group:3d} | {name:<25} | {status:<3} | {brightness:>4}\n")
+                
+            progress_buf.append("   ✅ Done\n")
+                
+            sys.stdout.write("".join(progress_buf))
+            progress_buf.clear()
+            
             print(f"   📊 Found {found_in_range} lights in {range_name}")
         
         print("\n" + "="*80)
@@ -185,11 +210,9 @@ async def comprehensive_scan():
             print("• Lights require different query method")
             
         # Cleanup
-        try:
-            await cbus.disconnect()
-            os.remove(temp_config)
-        except:
-            pass
+        await cbus.stop()
+        
+        return all_lights
             
     except Exception as e:
         print(f"❌ Scan failed: {e}")
@@ -7,6 +7,9 @@ Scans ALL possible C-Bus groups (1-255) to find all lights in your system.
 import asyncio
 import json
 import logging
+import socket
+import sys
+import threading
 import time
 from datetime import datetime
 import paho.mqtt.client as mqtt
@@ -21,76 +24,180 @@ MQTT_PASSWORD = "pai"
 CBUS_NETWORK = 254
 CBUS_APPLICATION = 56
 
+# Lights found by earlier runs; groups seen within the TTL are not probed
+# again (run with --refresh to ignore the cache)
+DISCOVERY_CACHE_FILE = "discovered_lights.cache.json"
+DISCOVERY_CACHE_TTL = 24 * 60 * 60  # seconds
+
 class ComprehensiveLightScanner:
     """Scan ALL C-Bus groups to find every light in the system."""
     
-    def __init__(self):
-        self.client = mqtt.Client()
-        self.discovered_lights = {}
+    def __init__(self, client=None, use_cache=True):
+        """Create a scanner.
+        
+        Pass an already-connected Paho ``client`` (for example one shared
+        with other code in the same process) to scan over that connection
+        instead of opening a dedicated one. With ``use_cache`` False every
+        group is probed, whatever earlier runs found.
+        """
+        self._owns_client = client is None
+        self.client = mqtt.Client() if client is None else client
         self.connected = False
         
-        # Configure MQTT client
-        self.client.username_pw_set(MQTT_USER, MQTT_PASSWORD)
-        self.client.on_connect = self.on_connect
-        self.client.on_message = self.on_message
-        self.client.on_disconnect = self.on_disconnect
+        # Discovered lights as parallel arrays indexed by group number
+        self._seen = bytearray(256)
+        self._state = [None] * 256
+        self._level = [None] * 256
+        self._last_seen = [None] * 256
+        self.light_count = 0
+        
+        # Recently seen lights from earlier runs, keyed by group number
+        # string; they are skipped by the probe but not reported as found
+        self._cached = {}
+        if use_cache:
+            self.load_cache()
+        
+        # Set by on_connect once the broker has answered the CONNECT
+        self._connected_event = threading.Event()
+        
+        # Set by on_message when a new light appears, to wake the monitor
+        self._new_light_event = threading.Event()
+        
+        # Topic prefix for this network/application's light messages
+        self._prefix = f"cbus/read/{CBUS_NETWORK}/{CBUS_APPLICATION}/"
+        self._prefix_len = len(self._prefix)
+        
+        # C-Bus read topics the scanner subscribes to (state, level, tree)
+        self._topics = [
+            f"cbus/read/{CBUS_NETWORK}/{CBUS_APPLICATION}/+/state",
+            f"cbus/read/{CBUS_NETWORK}/{CBUS_APPLICATION}/+/level", 
+            f"cbus/read/{CBUS_NETWORK}///tree",
+        ]
+        
+        # Switch topic for every group, so the probe loops only index
+        self._switch_topics = [
+            f"cbus/write/{CBUS_NETWORK}/{CBUS_APPLICATION}/{group}/switch"
+            for group in range(256)
+        ]
+        
+        # Last formatted timestamp, reused for messages in the same second
+        self._last_ts_sec = None
+        self._last_ts_str = ""
+        
+        # Configure MQTT client. A shared client keeps its owner's settings
+        # and callbacks.
+        if self._owns_client:
+            self.client.username_pw_set(MQTT_USER, MQTT_PASSWORD)
+            self.client.on_connect = self.on_connect
+            self.client.on_message = self.on_message
+            self.client.on_disconnect = self.on_disconnect
         
+    @property
+    def discovered_lights(self):
+        """Discovered lights as a dict keyed by group number string."""
+        return {
+            str(g): {
+                'group': str(g),
+                'state': self._state[g],
+                'level': self._level[g],
+                'last_seen': self._last_seen[g],
+                'responsive': True
+            }
+            for g in range(256) if self._seen[g]
+        }
+        
+    def load_cache(self):
+        """Load lights seen by a previous run within DISCOVERY_CACHE_TTL."""
+        try:
+            with open(DISCOVERY_CACHE_FILE) as f:
+                lights = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable discovery cache: {e}")
+            return
+            
+        now = datetime.now()
+        for group, info in lights.items():
+            try:
+                age = (now - datetime.fromisoformat(info['last_seen'])).total_seconds()
+            except (KeyError, TypeError, ValueError):
+                continue  # No usable timestamp, so probe it again
+            if group.isdigit() and int(group) < 256 and age < DISCOVERY_CACHE_TTL:
+                self._cached[group] = info
+        print(f"📂 Loaded {len(self._cached)} recently seen lights from {DISCOVERY_CACHE_FILE}")
+            
     def on_connect(self, client, userdata, flags, rc):
         if rc == 0:
             print(f"✅ Connected to MQTT broker at {MQTT_BROKER}:{MQTT_PORT}")
-            self.connected = True
             
-            # Subscribe to ALL C-Bus state and level topics
-            topics = [
-                f"cbus/read/{CBUS_NETWORK}/{CBUS_APPLICATION}/+/state",
-                f"cbus/read/{CBUS_NETWORK}/{CBUS_APPLICATION}/+/level", 
-                f"cbus/read/{CBUS_NETWORK}///tree",
-            ]
+            # Send small PUBLISH packets immediately rather than letting Nagle
+            # hold them back
+            try:
+                client.socket().setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except (AttributeError, OSError) as e:
+                print(f"⚠️ Could not tune MQTT socket: {e}")
             
-            for topic in topics:
-                client.subscribe(topic)
-                print(f"📡 Subscribed to: {topic}")
+            self._subscribe(client)
                 
         else:
             print(f"❌ Failed to connect to MQTT broker (code: {rc})")
             
+        self._connected_event.set()
+            
+    def _subscribe(self, client):
+        """Subscribe to the C-Bus read topics and mark the scanner connected."""
+        # Subscribe to ALL C-Bus state and level topics, in one SUBSCRIBE packet
+        client.subscribe([(topic, 0) for topic in self._topics])
+        for topic in self._topics:
+            print(f"📡 Subscribed to: {topic}")
+            
+        # Only mark connected once the subscription is queued, so any
+        # discovery publishes reach the broker after it
+        self.connected = True
+        
     def on_disconnect(self, client, userdata, rc):
         print(f"⚠️ Disconnected from MQTT broker")
         self.connected = False
         
+    def _timestamp(self):
+        """Return the current local time in ISO format, formatted at most once a second."""
+        ts_sec = int(time.time())
+        if ts_sec != self._last_ts_sec:
+            self._last_ts_str = datetime.fromtimestamp(ts_sec).isoformat()
+            self._last_ts_sec = ts_sec
+        return self._last_ts_str
+        
     def on_message(self, client, userdata, msg):
         try:
             topic = msg.topic
-            payload = msg.payload.decode('utf-8').strip()
-            timestamp = datetime.now().strftime("%H:%M:%S")
             
             # Parse C-Bus light messages
-            if f"cbus/read/{CBUS_NETWORK}/{CBUS_APPLICATION}/" in topic:
-                parts = topic.split('/')
-                if len(parts) >= 6:
-                    group = parts[4]
-                    message_type = parts[5]  # 'state' or 'level'
+            if topic.startswith(self._prefix):
+                group, _, message_type = topic[self._prefix_len:].partition('/')
+                if message_type and group.isdigit() and int(group) < 256:  # 'state' or 'level'
+                    g = int(group)
+                    
+                    # Only decode and timestamp messages we actually use
+                    payload = msg.payload.decode('utf-8').strip()
+                    timestamp = self._timestamp()
                     
                     # Initialize light if not seen before
-                    if group not in self.discovered_lights:
-                        self.discovered_lights[group] = {
-                            'group': group,
-                            'state': None,
-                            'level': None,
-                            'last_seen': timestamp,
-                            'responsive': True
-                        }
+                    if not self._seen[g]:
+                        self._seen[g] = 1
+                        self.light_count += 1
                         print(f"[{timestamp}] 🔍 NEW LIGHT: Group {group}")
+                        self._new_light_event.set()
                     
                     # Update light information
                     if message_type == 'state':
-                        self.discovered_lights[group]['state'] = payload
+                        self._state[g] = payload
                         print(f"[{timestamp}] 💡 Group {group}: State = {payload}")
                     elif message_type == 'level':
-                        self.discovered_lights[group]['level'] = payload
+                        self._level[g] = payload
                         print(f"[{timestamp}] 🔆 Group {group}: Level = {payload}")
                     
-                    self.discovered_lights[group]['last_seen'] = timestamp
+                    self._last_seen[g] = timestamp
                     
         except Exception as e:
             print(f"❌ Error processing message: {e}")
@@ -116,29 +223,23 @@ class ComprehensiveLightScanner:
         # 3. Test individual groups systematically
         print(f"📤 3. Testing individual groups...")
         
-        # Test in batches to avoid overwhelming the system
-        test_ranges = [
-            (1, 20),     # Common residential lights
-            (21, 50),    # Extended residential
-            (51, 100),   # Commercial/extended
-            (101, 150),  # High-end systems
-            (151, 200),  # Large installations
-            (201, 255),  # Maximum range
-        ]
-        
-        for start, end in test_ranges:
-            print(f"   Testing groups {start}-{end}...")
-            for group in range(start, end + 1):
-                # Query group state
-                query_topic = f"cbus/write/{CBUS_NETWORK}/{CBUS_APPLICATION}/{group}/switch"
-                # Send a "status request" - this should trigger a response if light exists
-                self.client.publish(query_topic, "STATUS", 1)
+        # STATUS queries are idempotent, so they go out at QoS 0 with no
+        # PUBACK round-trips; a lost one just means a missed group. The burst
+        # is paced at about 1ms per query, checked every 32 groups against a
+        # monotonic deadline so sleep overshoot doesn't accumulate.
+        print("   Testing groups 1-255...")
+        deadline = time.monotonic()
+        for group in range(1, 256):
+            if group % 32 == 0:
+                deadline += 0.032
+                time.sleep(max(0, deadline - time.monotonic()))
                 
-                # Small delay to avoid overwhelming
-                time.sleep(0.05)  # 50ms between queries
+            # Skip lights already known to respond
+            if self._seen[group] or str(group) in self._cached:
+                continue
                 
-            # Larger delay between ranges
-            time.sleep(1)
+            # Send a "status request" - this should trigger a response if light exists
+            self.client.publish(self._switch_topics[group], "STATUS", 0)
             
         print("✅ Comprehensive discovery commands sent!")
         
@@ -162,7 +263,7 @@ class ComprehensiveLightScanner:
                 print(f"   Testing groups {group-19}-{group}...")
                 
             # Send brief ON pulse
-            on_topic = f"cbus/write/{CBUS_NETWORK}/{CBUS_APPLICATION}/{group}/switch"
+            on_topic = self._switch_topics[group]
             self.client.publish(on_topic, "ON", 1)
             time.sleep(0.1)  # Very brief
             
@@ -174,20 +275,24 @@ class ComprehensiveLightScanner:
         
     def print_summary(self):
         """Print summary of ALL discovered lights."""
-        print("\n" + "="*80)
-        print("📋 COMPREHENSIVE LIGHT DISCOVERY RESULTS")
-        print("="*80)
+        # Build the whole report and write it in one go
+        lines = [
+            "",
+            "="*80,
+            "📋 COMPREHENSIVE LIGHT DISCOVERY RESULTS",
+            "="*80,
+        ]
         
-        if self.discovered_lights:
-            # Sort by group number
-            sorted_lights = sorted(self.discovered_lights.items(), key=lambda x: int(x[0]))
+        if self.light_count:
+            lines.append(f"🎉 FOUND {self.light_count} C-BUS LIGHTS!\n")
             
-            print(f"🎉 FOUND {len(sorted_lights)} C-BUS LIGHTS!\n")
-            
-            for group, info in sorted_lights:
-                state = info.get('state', 'Unknown')
-                level = info.get('level', 'Unknown')
-                last_seen = info.get('last_seen', 'Unknown')
+            # Arrays are indexed by group, so this is already in order
+            for group in range(256):
+                if not self._seen[group]:
+                    continue
+                state = self._state[group]
+                level = self._level[group]
+                last_seen = self._last_seen[group]
                 
                 # Determine status
                 if state == 'ON':
@@ -197,23 +302,44 @@ class ComprehensiveLightScanner:
                 else:
                     status = f"❓ {state} (Level: {level})"
                     
-                print(f"Group {group:>3}: {status:<25} | Last seen: {last_seen}")
+                lines.append(f"Group {group:>3}: {status:<25} | Last seen: {last_seen}")
                 
-            print(f"\n✅ TOTAL LIGHTS DISCOVERED: {len(sorted_lights)}")
+            lines.append(f"\n✅ TOTAL LIGHTS DISCOVERED: {self.light_count}")
             
-            # Save to file
+            # Save this run's results, and a cache for the next run that also
+            # keeps cached lights not seen again until they expire
             results_file = f"discovered_lights_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(results_file, 'w') as f:
-                json.dump(self.discovered_lights, f, indent=2)
-            print(f"💾 Results saved to: {results_file}")
+            discovered = self.discovered_lights
+            data = json.dumps(discovered, indent=2)
+            
+            # The cache only differs when cached lights weren't seen again
+            carried = {g: info for g, info in self._cached.items() if g not in discovered}
+            cache_data = json.dumps({**carried, **discovered}, indent=2) if carried else data
+            
+            for path, contents in ((results_file, data), (DISCOVERY_CACHE_FILE, cache_data)):
+                with open(path, 'w') as f:
+                    f.write(contents)
+            lines.append(f"💾 Results saved to: {results_file}")
             
         else:
-            print("😞 No lights discovered.")
-            print("\nPossible issues:")
-            print("• MQTT broker not accessible")
-            print("• C-Bus CNI not responding") 
-            print("• Wrong network/application numbers")
-            print("• All lights are unresponsive")
+            lines.extend([
+                "😞 No lights discovered.",
+                "\nPossible issues:",
+                "• MQTT broker not accessible",
+                "• C-Bus CNI not responding",
+                "• Wrong network/application numbers",
+                "• All lights are unresponsive",
+            ])
+            
+        # Cached lights that were skipped and haven't reported since
+        not_rechecked = sum(1 for group in self._cached if not self._seen[int(group)])
+        if not_rechecked:
+            lines.append(
+                f"📂 {not_rechecked} lights seen in the last {DISCOVERY_CACHE_TTL // 3600}h "
+                "were not probed again (run with --refresh to re-check them)"
+            )
+            
+        sys.stdout.write("\n".join(lines) + "\n")
             
     def run_scan(self, duration=120):
         """Run comprehensive light discovery scan."""
@@ -223,22 +349,24 @@ class ComprehensiveLightScanner:
         print(f"Duration: {duration} seconds\n")
         
         try:
-            # Connect to MQTT
-            self.client.connect(MQTT_BROKER, MQTT_PORT, 60)
-            self.client.loop_start()
-            
-            # Wait for connection
-            timeout = 10
-            while not self.connected and timeout > 0:
-                time.sleep(1)
-                timeout -= 1
+            if self._owns_client:
+                # Connect to MQTT in the network thread rather than blocking here
+                self.client.connect_async(MQTT_BROKER, MQTT_PORT, 60)
+                self.client.loop_start()
+                
+                # Wait for the broker to accept or refuse the connection
+                self._connected_event.wait(timeout=10)
+            elif self.client.is_connected():
+                # Route only our topics to on_message, leaving the owner's
+                # handler alone
+                self.client.message_callback_add(self._prefix + "+/+", self.on_message)
+                self._subscribe(self.client)
                 
             if not self.connected:
                 print("❌ Failed to connect to MQTT broker")
                 return
                 
             # Start discovery
-            time.sleep(2)  # Let subscriptions settle
             self.send_comprehensive_discovery()
             
             # Ask about force discovery
@@ -246,33 +374,35 @@ class ComprehensiveLightScanner:
             print("💡 Tip: Turn physical lights on/off to help discovery")
             
             # Monitor for responses
-            start_time = time.time()
+            deadline = time.monotonic() + duration
             last_count = 0
             
-            while time.time() - start_time < duration:
-                remaining = int(duration - (time.time() - start_time))
-                current_count = len(self.discovered_lights)
+            while time.monotonic() < deadline:
+                # Wake for a new light or the next countdown tick
+                self._new_light_event.wait(timeout=min(1, deadline - time.monotonic()))
+                self._new_light_event.clear()
+                
+                remaining = max(0, int(deadline - time.monotonic()))
+                current_count = self.light_count
                 
                 if current_count != last_count:
                     print(f"\r⏰ Time: {remaining:3d}s | Lights found: {current_count:3d} (NEW!)", end='', flush=True)
                     last_count = current_count
                 else:
                     print(f"\r⏰ Time: {remaining:3d}s | Lights found: {current_count:3d}", end='', flush=True)
-                    
-                time.sleep(1)
                 
             print("\n")
             
             # Offer force discovery if few lights found
-            if len(self.discovered_lights) < 20:
-                print(f"\n🤔 Only found {len(self.discovered_lights)} lights, but you have ~100.")
+            if self.light_count < 20:
+                print(f"\n🤔 Only found {self.light_count} lights, but you have ~100.")
                 print("This suggests lights are OFF and not responding to queries.")
                 self.force_light_discovery()
                 
                 # Monitor for additional responses
                 print("Monitoring for 30 more seconds after force discovery...")
                 for i in range(30, 0, -1):
-                    print(f"\r⏰ Monitoring: {i:2d}s | Total lights: {len(self.discovered_lights):3d}", end='', flush=True)
+                    print(f"\r⏰ Monitoring: {i:2d}s | Total lights: {self.light_count:3d}", end='', flush=True)
                     time.sleep(1)
                 print("\n")
                 
@@ -283,14 +413,21 @@ class ComprehensiveLightScanner:
             print(f"❌ Scanner failed: {e}")
             
         finally:
-            self.client.loop_stop()
-            self.client.disconnect()
+            if self._owns_client:
+                self.client.loop_stop()
+                self.client.disconnect()
+            else:
+                # Hand the shared client back without our subscriptions
+                self.client.message_callback_remove(self._prefix + "+/+")
+                if self.connected:
+                    self.client.unsubscribe(self._topics)
             self.print_summary()
 
 
 def main():
     """Main function."""
-    scanner = ComprehensiveLightScanner()
+    # --refresh probes every group, ignoring lights cached by earlier runs
+    scanner = ComprehensiveLightScanner(use_cache="--refresh" not in sys.argv[1:])
     
     print("This scanner will find ALL C-Bus lights in your system!")
     print("It will test groups 1-255 systematically.\n")
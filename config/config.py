@@ -2,13 +2,25 @@
 Configuration management for CBus MQTT Bridge
 """
 
+import asyncio
+import copy
 import logging
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import aiofiles
 import yaml
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Parsed YAML per file path, as (st_mtime_ns, data), so reloads only re-parse
+# files that changed. One entry per path keeps it bounded.
+_YAML_CACHE: Dict[str, Tuple[int, Any]] = {}
+
 
 class Config:
     """Configuration manager for CBus MQTT Bridge."""
@@ -19,20 +31,42 @@ class Config:
         self.data = {}
         self.logger = logging.getLogger(__name__)
         
+        # Dotted key -> value for every node in data, built on first get()
+        self._flat: Optional[Dict[str, Any]] = None
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], config_path: str = "") -> "Config":
+        """Create a configuration from an in-memory dictionary.
+        
+        The data is validated and given the same defaults as a loaded file,
+        but no files are read.
+        """
+        config = cls(config_path)
+        config.data = data
+        config._validate_config()
+        config._flat = None
+        return config
+        
     async def load(self):
         """Load configuration from file."""
         try:
-            async with aiofiles.open(self.config_path, 'r') as f:
-                content = await f.read()
-                self.data = yaml.safe_load(content)
+            # The main file and the optional extra files are independent, so
+            # read them concurrently
+            main_config, devices_config, areas_config = await asyncio.gather(
+                self._read_yaml(self.config_path),
+                self._read_optional_yaml(self.config_dir / "devices.yaml", "devices"),
+                self._read_optional_yaml(self.config_dir / "areas.yaml", "areas"),
+            )
+            self.data = main_config
                 
             self.logger.info(f"Configuration loaded from {self.config_path}")
             
             # Validate configuration
             self._validate_config()
             
-            # Load additional configuration files
-            await self._load_additional_configs()
+            # Merge additional configuration files
+            self._apply_additional_configs(devices_config, areas_config)
+            self._flat = None
             
         except FileNotFoundError:
             self.logger.error(f"Configuration file not found: {self.config_path}")
@@ -44,30 +78,48 @@ class Config:
             self.logger.error(f"Error loading configuration: {e}")
             raise
             
-    async def _load_additional_configs(self):
-        """Load additional configuration files."""
-        # Load devices configuration
-        devices_path = self.config_dir / "devices.yaml"
-        if devices_path.exists():
+    async def _read_yaml(self, path: Path) -> Any:
+        """Read and parse a YAML file, reusing the last parse if unchanged."""
+        key = str(path)
+        mtime_ns = path.stat().st_mtime_ns
+        cached = _YAML_CACHE.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            # Callers modify the result, so hand out a copy
+            return copy.deepcopy(cached[1])
+            
+        async with aiofiles.open(path, 'r') as f:
+            content = await f.read()
+        parsed = yaml.load(content, Loader=SafeLoader)
+        _YAML_CACHE[key] = (mtime_ns, parsed)
+        return copy.deepcopy(parsed)
+        
+    async def _read_optional_yaml(self, path: Path, name: str) -> Any:
+        """Read and parse an optional YAML file, returning None if unavailable."""
+        if not path.exists():
+            return None
+            
+        try:
+            return await self._read_yaml(path)
+        except Exception as e:
+            self.logger.warning(f"Could not load {name} configuration: {e}")
+            return None
+            
+    def _apply_additional_configs(self, devices_config: Any, areas_config: Any):
+        """Merge the devices and areas configuration into the main data."""
+        # Devices configuration
+        if devices_config is not None:
             try:
-                async with aiofiles.open(devices_path, 'r') as f:
-                    content = await f.read()
-                    devices_config = yaml.safe_load(content)
-                    self.data['devices'] = devices_config.get('devices', [])
-                    self.data['templates'] = devices_config.get('templates', [])
-                    self.logger.info(f"Devices configuration loaded from {devices_path}")
+                self.data['devices'] = devices_config.get('devices', [])
+                self.data['templates'] = devices_config.get('templates', [])
+                self.logger.info(f"Devices configuration loaded from {self.config_dir / 'devices.yaml'}")
             except Exception as e:
                 self.logger.warning(f"Could not load devices configuration: {e}")
         
-        # Load areas configuration
-        areas_path = self.config_dir / "areas.yaml"
-        if areas_path.exists():
+        # Areas configuration
+        if areas_config is not None:
             try:
-                async with aiofiles.open(areas_path, 'r') as f:
-                    content = await f.read()
-                    areas_config = yaml.safe_load(content)
-                    self.data['areas'] = areas_config.get('areas', [])
-                    self.logger.info(f"Areas configuration loaded from {areas_path}")
+                self.data['areas'] = areas_config.get('areas', [])
+                self.logger.info(f"Areas configuration loaded from {self.config_dir / 'areas.yaml'}")
             except Exception as e:
                 self.logger.warning(f"Could not load areas configuration: {e}")
                 
@@ -129,18 +181,25 @@ class Config:
         self.data.setdefault('logging', {})
         self.data['logging'].setdefault('level', 'INFO')
         
+    def _flatten(self) -> Dict[str, Any]:
+        """Index every section and value in data by its dotted key."""
+        flat = {}
+        stack = [('', self.data)]
+        while stack:
+            prefix, section = stack.pop()
+            for k, value in section.items():
+                key = prefix + str(k)
+                flat[key] = value
+                if isinstance(value, dict):
+                    stack.append((key + '.', value))
+        return flat
+        
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value using dot notation."""
-        keys = key.split('.')
-        value = self.data
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-                
-        return value
+        flat = self._flat
+        if flat is None:
+            flat = self._flat = self._flatten()
+        return flat.get(key, default)
         
     def set(self, key: str, value: Any):
         """Set configuration value using dot notation."""
@@ -153,6 +212,7 @@ class Config:
             data = data[k]
             
         data[keys[-1]] = value
+        self._flat = None
         
     def get_devices(self) -> list:
         """Get devices configuration."""
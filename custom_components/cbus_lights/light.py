@@ -50,7 +50,7 @@ async def async_setup_entry(
     # Subscribe to discovery topics to find lights automatically
     await manager.async_setup_discovery()
     
-    # Start comprehensive scanning for ALL lights (1-255)
+    # Ask cmqttd for every light's state; replies arrive on the subscriptions
     await manager.async_comprehensive_scan()
 
 
@@ -121,8 +121,8 @@ class CBusLightDiscoveryManager:
             _LOGGER.error(f"Error discovering light from {msg.topic}: {e}")
     
     async def async_comprehensive_scan(self):
-        """Perform comprehensive scan of ALL possible C-Bus groups (1-255)."""
-        _LOGGER.info("🚀 Starting comprehensive C-Bus light scan (Groups 1-255)")
+        """Ask cmqttd for the network tree and the state of every group."""
+        _LOGGER.info("🚀 Starting comprehensive C-Bus light scan")
         
         # 1. Request network tree
         tree_topic = f"cbus/write/{self.network}///gettree"
@@ -134,58 +134,9 @@ class CBusLightDiscoveryManager:
         await mqtt.async_publish(self.hass, getall_topic, "", 1)
         _LOGGER.info(f"📤 Requested all lights: {getall_topic}")
         
-        # 3. Systematically test all possible groups
-        # Split into batches to avoid overwhelming the system
-        test_ranges = [
-            (1, 50),      # Common residential lights
-            (51, 100),    # Extended residential/commercial
-            (101, 150),   # Large installations
-            (151, 200),   # Very large installations  
-            (201, 255),   # Maximum C-Bus range
-        ]
-        
-        import asyncio
-        
-        for start, end in test_ranges:
-            _LOGGER.info(f"🔍 Testing C-Bus groups {start}-{end}...")
-            
-            # Create tasks for batch processing
-            tasks = []
-            for group in range(start, end + 1):
-                task = self._async_test_group(group)
-                tasks.append(task)
-                
-            # Process batch with controlled concurrency
-            await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Small delay between batches
-            await asyncio.sleep(1)
-            
-        _LOGGER.info("✅ Comprehensive C-Bus scan completed")
-        
-        # Log summary
-        total_discovered = len(self.discovered_lights)
-        _LOGGER.info(f"📊 Total lights discovered: {total_discovered}")
-        
-        if total_discovered < 10:
-            _LOGGER.warning("⚠️ Only found a few lights. Many may be OFF and unresponsive.")
-            _LOGGER.info("💡 Try turning some lights ON physically to help discovery.")
-    
-    async def _async_test_group(self, group):
-        """Test a specific C-Bus group for existence."""
-        try:
-            # Send a status query to the group
-            query_topic = f"cbus/write/{self.network}/{self.application}/{group}/switch"
-            
-            # Use a gentle query method - just request status
-            await mqtt.async_publish(self.hass, query_topic, "STATUS", 1)
-            
-            # Small delay to allow response
-            import asyncio
-            await asyncio.sleep(0.05)  # 50ms
-            
-        except Exception as e:
-            _LOGGER.debug(f"Error testing group {group}: {e}")
+        # cmqttd answers getall with the state of every group it knows, and
+        # the wildcard subscriptions above turn those into entities, so no
+        # per-group STATUS probe is needed
 
 
 class CBusLight(LightEntity):
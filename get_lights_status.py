@@ -108,9 +108,6 @@ async def get_all_lights_status():
                     print(f"Group {group:3d} | {name:<20} | {status:<3} | {brightness:>4}")
                 else:
                     print(f"Group {group:3d} | {name:<20} | ??? | N/A")
-                    
-                # Small delay to avoid overwhelming the system
-                await asyncio.sleep(0.1)
                 
             except Exception as e:
                 print(f"Group {group:3d} | Unknown              | ERR | Failed: {e}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Check how the C-Bus interface handles a PCI/CNI that drops the connection.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# Add the project directory to Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from cbus.interface import CBusInterface
+from config.config import Config
+
+
+async def serve_then_close(reader, writer):
+    """Accept the init commands like a PCI, then hang up."""
+    while True:
+        line = await reader.readline()
+        if not line or line == b"g\r\n":  # Last init command
+            break
+    writer.close()
+
+
+def test_monitoring_loop_stops_when_peer_closes():
+    """A closed connection ends the loops without starving the event loop."""
+    result = {}
+
+    async def run():
+        server = await asyncio.start_server(serve_then_close, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            config = Config.from_dict({
+                'cbus': {'interface': 'tcp', 'host': '127.0.0.1', 'port': port},
+                'mqtt': {'broker': 'localhost'},
+            })
+            cbus = CBusInterface(config)
+            await cbus.start()
+
+            # Other tasks must keep getting scheduled after the hang-up
+            ticks = 0
+            for _ in range(50):
+                await asyncio.sleep(0.01)
+                ticks += 1
+                if cbus.monitoring_task.done():
+                    break
+
+            result['ticks'] = ticks
+            result['connected'] = cbus.connected
+            result['monitoring_done'] = cbus.monitoring_task.done()
+            await cbus.stop()
+
+    # Run in a thread so a frozen event loop fails the test instead of
+    # hanging the run
+    thread = threading.Thread(target=asyncio.run, args=(run(),), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive(), "event loop stopped making progress"
+    assert result['ticks'] > 0
+    assert result['connected'] is False
+    assert result['monitoring_done'] is True
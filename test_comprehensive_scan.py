@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Run the comprehensive scan against a stub C-Bus PCI.
+Checks that submitted level queries are sent and their replies reaped.
+"""
+
+import asyncio
+import re
+import sys
+from pathlib import Path
+
+# Add the project directory to Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import cbus.interface
+import comprehensive_cbus_scan
+
+# Groups the stub answers for, with their levels
+STUB_LEVELS = {1: 255, 7: 0, 60: 128, 254: 64}
+
+_STATUS_RE = re.compile(rb"g38([0-9A-F]{2})")
+_LABEL_RE = re.compile(rb"get 38 ([0-9A-F]{2}) label")
+
+
+async def serve_stub_pci(reader, writer):
+    """Answer status and label queries like a PCI on application 56."""
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        line = line.strip()
+
+        status = _STATUS_RE.fullmatch(line)
+        if status:
+            group = int(status.group(1), 16)
+            if group in STUB_LEVELS:
+                writer.write(b"g38%02X%02X\r\n" % (group, STUB_LEVELS[group]))
+            continue
+
+        label = _LABEL_RE.fullmatch(line)
+        if label:
+            writer.write(b"label: Light %d\r\n" % int(label.group(1), 16))
+
+    writer.close()
+
+
+def run_scan(**kwargs):
+    """Run the scan against a fresh stub PCI and return the lights found."""
+    async def run():
+        server = await asyncio.start_server(serve_stub_pci, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await comprehensive_cbus_scan.comprehensive_scan("127.0.0.1", port, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_comprehensive_scan_reaps_completions(monkeypatch, tmp_path):
+    """Every group the stub answers is reported with its level."""
+    # Don't let pacing or reply timeouts dominate the run
+    monkeypatch.setattr(cbus.interface, "COMMAND_RATE", 10000)
+    monkeypatch.setattr(comprehensive_cbus_scan, "RESPONSE_TIMEOUT", 0.3)
+    monkeypatch.chdir(tmp_path)
+
+    lights = run_scan()
+
+    assert sorted(lights) == sorted(STUB_LEVELS)
+    for group, level in STUB_LEVELS.items():
+        assert lights[group]['level'] == level
+        assert lights[group]['name'] == f"Group {group}"
+        assert lights[group]['status'] == ("ON" if level else "OFF")
+
+
+def test_comprehensive_scan_queries_labels_on_request(monkeypatch, tmp_path):
+    """With query_labels set, found groups are named from their labels."""
+    monkeypatch.setattr(cbus.interface, "COMMAND_RATE", 10000)
+    monkeypatch.setattr(comprehensive_cbus_scan, "RESPONSE_TIMEOUT", 0.3)
+    monkeypatch.chdir(tmp_path)
+
+    lights = run_scan(query_labels=True)
+
+    assert sorted(lights) == sorted(STUB_LEVELS)
+    for group in STUB_LEVELS:
+        assert lights[group]['name'] == f"Light {group}"